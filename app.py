@@ -6,11 +6,16 @@ from src.cost_tracker import CostTracker
 import plotly.express as px
 import pandas as pd
 import os
+import uuid
 
 load_dotenv()
 
 analyzer = ContentAnalyzer()
 cost_tracker = CostTracker()
+# Worst case per document: the primary call plus an escalation call.
+cascade_models = [analyzer.primary_model]
+if analyzer.escalation_model != analyzer.primary_model:
+    cascade_models.append(analyzer.escalation_model)
 
 
 st.set_page_config(layout="wide")
@@ -23,6 +28,30 @@ if "monthly_usage" not in st.session_state:
 
 # --- Load initial data ---
 
+COST_PER_DOCUMENT_LIMIT = 50
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def build_dashboard_figures(data_version, _df):
+    """Builds the analytics figures once per data version instead of on every rerun."""
+    def counts(column):
+        counted = _df[column].value_counts().reset_index()
+        counted.columns = [column, "Count"]
+        return counted
+
+    top_cost = _df.nlargest(COST_PER_DOCUMENT_LIMIT, "Cost")
+    cost_title = "Cost per Document"
+    if len(_df) > COST_PER_DOCUMENT_LIMIT:
+        cost_title = f"Cost per Document (Top {COST_PER_DOCUMENT_LIMIT} of {len(_df)})"
+
+    return {
+        "sentiment": px.pie(counts("Sentiment"), names="Sentiment", values="Count", title="Sentiment Distribution"),
+        "impact": px.bar(counts("Business Impact"), x="Business Impact", y="Count", title="Business Impact Bar Chart"),
+        "confidence": px.histogram(_df, x="Confidence", nbins=10, title="Confidence Score Distribution"),
+        "cost": px.bar(top_cost, x="Document", y="Cost", title=cost_title, labels={"Cost": "$USD"}),
+        "content_type": px.pie(counts("Content Type"), names="Content Type", values="Count", title="Content Type Breakdown"),
+    }
+
 
 # --- Analytics Dashboard Tabs ---
 
@@ -37,10 +66,12 @@ with tab3:
     # Load data from session state if available, otherwise from file or simulation
     if "batch_results_df" in st.session_state:
         df = st.session_state.batch_results_df
+        data_version = st.session_state.batch_results_version
     elif os.path.exists("batch_results.csv"):
         df = pd.read_csv("batch_results.csv")
+        data_version = f"csv:{os.path.getmtime('batch_results.csv')}"
         st.session_state.batch_results_df = df  # Save to session state
-        df.to_csv("batch_results.csv", index=False)
+        st.session_state.batch_results_version = data_version
     else:
         st.write("No batch analysis data found. Showing example data.")
         # Simulated data for demo purposes
@@ -53,31 +84,27 @@ with tab3:
             "Cost": [round(0.05 + 0.01 * (i % 7), 2) for i in range(20)],
             "Content Type": (["Blog Post", "News Article", "Press Release", "Social Media"] * 5)[:20]
         })
+        data_version = "demo"
+
+    figures = build_dashboard_figures(data_version, df)
 
     colA, colB = st.columns(2)
     with colA:
         st.subheader("Sentiment Distribution")
-        fig_sentiment = px.pie(df, names="Sentiment", title="Sentiment Distribution")
-        st.plotly_chart(fig_sentiment, use_container_width=True)
+        st.plotly_chart(figures["sentiment"], use_container_width=True)
 
         st.subheader("Business Impact Breakdown")
-        impact_counts = df["Business Impact"].value_counts().reset_index()
-        impact_counts.columns = ["Business Impact", "Count"]
-        fig_impact = px.bar(impact_counts, x="Business Impact", y="Count", title="Business Impact Bar Chart")
-        st.plotly_chart(fig_impact, use_container_width=True)
+        st.plotly_chart(figures["impact"], use_container_width=True)
 
     with colB:
         st.subheader("Confidence Score Histogram")
-        fig_conf = px.histogram(df, x="Confidence", nbins=10, title="Confidence Score Distribution")
-        st.plotly_chart(fig_conf, use_container_width=True)
+        st.plotly_chart(figures["confidence"], use_container_width=True)
 
         st.subheader("Cost per Document")
-        fig_cost = px.bar(df, x="Document", y="Cost", title="Cost per Document", labels={"Cost": "$USD"})
-        st.plotly_chart(fig_cost, use_container_width=True)
+        st.plotly_chart(figures["cost"], use_container_width=True)
 
     st.subheader("Content Type Breakdown")
-    fig_type = px.pie(df, names="Content Type", title="Content Type Breakdown")
-    st.plotly_chart(fig_type, use_container_width=True)
+    st.plotly_chart(figures["content_type"], use_container_width=True)
 
 # --- SINGLE ANALYSIS TAB ---
 
@@ -121,9 +148,8 @@ with tab1:
                     # Estimate cost
                     input_tokens = metadata['token_count']
                     output_tokens = 2048  # A reasonable estimate for the output
-                    estimated_cost = (input_tokens / 1_000_000) * cost_tracker.input_cost_per_million + \
-                                     (output_tokens / 1_000_000) * cost_tracker.output_cost_per_million
-                    st.warning(f"Estimated cost for this analysis: ${estimated_cost:.4f}")
+                    estimated_cost = cost_tracker.estimate_cost(input_tokens, output_tokens, cascade_models)
+                    st.warning(f"Estimated cost for this analysis: up to ${estimated_cost:.4f}")
 
                     os.remove(uploaded_file.name)
 
@@ -136,7 +162,7 @@ with tab1:
     with col2:
         st.subheader("Analysis Results")
         if analyze_button and uploaded_file is not None and content_input is not None:
-            can_afford, reason = cost_tracker.can_afford_analysis(input_tokens, output_tokens)
+            can_afford, reason = cost_tracker.can_afford_analysis(input_tokens, output_tokens, cascade_models)
 
             if not can_afford:
                 st.error(f"Analysis cannot proceed: {reason}")
@@ -145,7 +171,8 @@ with tab1:
                     analysis = analyzer.analyze_content(content_input, analysis_type)
                     # Record actual usage
                     if "usage" in analysis:
-                        cost_tracker.record_usage(analysis['usage']['prompt_tokens'], analysis['usage']['completion_tokens'])
+                        for call in analysis['usage']['calls']:
+                            cost_tracker.record_usage(call['prompt_tokens'], call['completion_tokens'], call['model'])
                         st.session_state.daily_usage = cost_tracker.get_daily_usage()
                         st.session_state.monthly_usage = cost_tracker.get_monthly_usage()
                     st.markdown("---")
@@ -225,6 +252,11 @@ with tab1:
                             st.subheader("Actionable Insights")
                             for insight in analysis.get("actionable_insights", []):
                                 st.warning(f"**Recommendation:** {insight.get('recommendation', 'N/A')} | **Priority:** {insight.get('priority', 'N/A')} | **Impact:** {insight.get('impact_on_satisfaction', 'N/A')}")
+                        routing = analysis.get("routing", {})
+                        if routing.get("escalated"):
+                            st.caption(f"Answered by {routing['model']} (escalated: {routing['reason']})")
+                        else:
+                            st.caption(f"Answered by {routing.get('model', 'N/A')}")
                         with st.expander("View Raw JSON Analysis"):
                             st.json(analysis)
         elif analyze_button:
@@ -232,38 +264,127 @@ with tab1:
 
 # --- BATCH PROCESSING TAB ---
 
-import pandas as pd
-from io import StringIO
-
-def extract_analysis_data(res, analysis_type, cost_tracker):
-    """Helper to extract relevant fields from analysis results."""
-    if not res:
-        return None, None, None, 0.0, None
-
-    sentiment, confidence, impact, content_type = None, None, None, None
-    if analysis_type == "General Business":
-        sentiment = res.get("sentiment_analysis", {}).get("overall_sentiment")
-        confidence = res.get("sentiment_analysis", {}).get("confidence_score")
-        impact = ", ".join([i.get("impact", "") for i in res.get("key_insights", []) if i.get("impact")] )
-        content_type = res.get("content_classification", {}).get("content_type")
-    elif analysis_type == "Competitive Intelligence":
-        sentiment = res.get("sentiment_analysis", {}).get("overall_sentiment", "N/A")
-        confidence = res.get("sentiment_analysis", {}).get("confidence_score", 0.0)
-        impact = ", ".join([t.get("threat_level", "") for t in res.get("strategic_analysis", {}).get("competitive_threats", []) if t.get("threat_level")] )
-        content_type = "N/A"
-    elif analysis_type == "Customer Feedback":
-        sentiment = res.get("sentiment_analysis", {}).get("overall_customer_satisfaction")
-        confidence = res.get("sentiment_analysis", {}).get("satisfaction_score")
-        impact = ", ".join([i.get("impact_on_satisfaction", "") for i in res.get("actionable_insights", []) if i.get("impact_on_satisfaction")] )
-        content_type = res.get("feedback_classification", {}).get("feedback_type")
-    
-    usage = res.get("usage")
-    cost = 0.0
-    if usage:
-        cost = (usage.get('prompt_tokens', 0) / 1_000_000) * cost_tracker.input_cost_per_million + \
-               (usage.get('completion_tokens', 0) / 1_000_000) * cost_tracker.output_cost_per_million
-    
-    return sentiment, impact, confidence, cost, content_type
+# Per-template column maps for flattening batch results. Scalar columns map to
+# the dotted path produced by pd.json_normalize (None means not available for
+# the template); "Business Impact" joins a field across a list of findings.
+BATCH_COLUMN_MAPS = {
+    "General Business": {
+        "columns": {
+            "Sentiment": "sentiment_analysis.overall_sentiment",
+            "Confidence": "sentiment_analysis.confidence_score",
+            "Content Type": "content_classification.content_type",
+        },
+        "impact": ("key_insights", "impact"),
+    },
+    "Competitive Intelligence": {
+        "columns": {
+            "Sentiment": "sentiment_analysis.overall_sentiment",
+            "Confidence": "sentiment_analysis.confidence_score",
+            "Content Type": None,
+        },
+        "impact": ("strategic_analysis.competitive_threats", "threat_level"),
+    },
+    "Customer Feedback": {
+        "columns": {
+            "Sentiment": "sentiment_analysis.overall_customer_satisfaction",
+            "Confidence": "sentiment_analysis.satisfaction_score",
+            "Content Type": "feedback_classification.feedback_type",
+        },
+        "impact": ("actionable_insights", "impact_on_satisfaction"),
+    },
+}
+PAGE_SIZE_OPTIONS = [50, 100, 500, 1000]
+
+
+def _join_list_field(series, field):
+    """Joins `field` across each row's list of dicts, e.g. impacts -> "High, Medium"."""
+    values = series.explode().str.get(field).dropna().astype(str)
+    values = values[values != ""]
+    return values.groupby(level=0).agg(", ".join).reindex(series.index)
+
+
+def _usage_costs(flat, cost_tracker):
+    """Prices every model call in each row's usage at its own model's rates."""
+    frames = []
+    has_calls = pd.Series(False, index=flat.index)
+    if "usage.calls" in flat:
+        calls = flat["usage.calls"].explode().dropna()
+        has_calls = flat["usage.calls"].map(lambda c: isinstance(c, list) and len(c) > 0)
+        if not calls.empty:
+            frames.append(pd.json_normalize(calls.tolist()).set_index(calls.index))
+    if "usage.prompt_tokens" in flat:
+        # Usage without a per-call breakdown is priced as one call on usage.model.
+        single = flat.loc[~has_calls & flat["usage.prompt_tokens"].notna()]
+        frames.append(pd.DataFrame({
+            "model": single["usage.model"] if "usage.model" in single else pd.NA,
+            "prompt_tokens": single["usage.prompt_tokens"],
+            "completion_tokens": single.get("usage.completion_tokens", 0),
+        }, index=single.index))
+    if not frames:
+        return pd.Series(0.0, index=flat.index)
+
+    calls = pd.concat(frames)
+    models = calls["model"].astype(object).fillna("")
+    input_prices, output_prices = cost_tracker.price_table(models.unique())
+    tokens_in = pd.to_numeric(calls["prompt_tokens"], errors='coerce').fillna(0)
+    tokens_out = pd.to_numeric(calls["completion_tokens"], errors='coerce').fillna(0)
+    cost = (tokens_in / 1_000_000) * models.map(input_prices) + (tokens_out / 1_000_000) * models.map(output_prices)
+    return cost.groupby(level=0).sum().reindex(flat.index, fill_value=0.0)
+
+
+def flatten_batch_results(results, analysis_type, cost_tracker):
+    """Flattens batch_analyze results into the dashboard DataFrame in one pass."""
+    column_map = BATCH_COLUMN_MAPS[analysis_type]
+    # Errored documents keep only their usage so the calls they made are priced.
+    flat = pd.json_normalize([
+        result.get("result") or ({"usage": result["usage"]} if result.get("usage") else {})
+        for result in results
+    ])
+    flat.index = pd.RangeIndex(len(results))
+    missing = pd.Series(pd.NA, index=flat.index, dtype=object)
+
+    def column(path):
+        return flat[path] if path in flat else missing
+
+    errors = pd.Series([result.get("error") for result in results], index=flat.index, dtype=object)
+    impact_path, impact_field = column_map["impact"]
+    impact = _join_list_field(flat[impact_path], impact_field) if impact_path in flat else missing
+
+    df = pd.DataFrame({
+        "Document": [result.get("id") for result in results],
+        "Type": analysis_type,
+        "Sentiment": column(column_map["columns"]["Sentiment"]).fillna(errors).fillna("N/A"),
+        "Business Impact": impact.replace("", pd.NA).fillna("N/A"),
+        "Confidence": pd.to_numeric(column(column_map["columns"]["Confidence"]), errors='coerce').fillna(0.0),
+        "Cost": _usage_costs(flat, cost_tracker),
+        "Content Type": column(column_map["columns"]["Content Type"]).replace("", pd.NA).fillna("N/A"),
+    })
+    return df
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def batch_results_csv(data_version, _df):
+    """Serializes the batch results to CSV once per data version."""
+    return _df.to_csv(index=False).encode('utf-8')
+
+
+def render_paginated_table(df, key):
+    """Renders one page of `df` so only the visible rows are sent to the browser."""
+    total = len(df)
+    col_size, col_page, col_info = st.columns([1, 1, 2])
+    page_size = col_size.selectbox("Rows per page", PAGE_SIZE_OPTIONS, key=f"{key}_page_size")
+    pages = max(1, -(-total // page_size))
+    if st.session_state.get(f"{key}_page", 1) > pages:
+        st.session_state[f"{key}_page"] = pages
+    page = col_page.number_input("Page", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+    start = (page - 1) * page_size
+    end = min(start + page_size, total)
+    col_info.caption(f"Showing rows {start + 1 if total else 0}-{end} of {total}")
+    st.dataframe(
+        df.iloc[start:end],
+        use_container_width=True,
+        column_config={"Cost": st.column_config.NumberColumn("Cost", format="$%.4f")}
+    )
 
 
 with tab2:
@@ -310,6 +431,7 @@ with tab2:
                     os.remove(temp_path)
 
         if docs:
+            analyzer.reset_routing_stats()
             progress_bar = st.progress(0)
             results = analyzer.batch_analyze(
                 docs, 
@@ -318,48 +440,45 @@ with tab2:
             )
             progress_bar.empty()
 
-            rows = []
-            for doc, result in zip(docs, results):
-                res = result.get("result")
-                error = result.get("error")
-                
-                sentiment, impact, confidence, cost, content_type = extract_analysis_data(res, st.session_state.batch_analysis_type, cost_tracker)
-
-                rows.append({
-                    "Document": doc["id"],
-                    "Type": st.session_state.batch_analysis_type,
-                    "Sentiment": sentiment if sentiment is not None else (error or "N/A"),
-                    "Business Impact": impact if impact else "N/A",
-                    "Confidence": float(confidence) if confidence is not None else 0.0,
-                    "Cost": cost,
-                    "Content Type": content_type if content_type else "N/A"
-                })
-
-            df = pd.DataFrame(rows)
-            df['Confidence'] = pd.to_numeric(df['Confidence'], errors='coerce').fillna(0.0)
-            df['Cost'] = pd.to_numeric(df['Cost'], errors='coerce').fillna(0.0)
-            
-            st.session_state.batch_results_df = df.copy()
-            df.to_csv("batch_results.csv", index=False)
-            
-            df_display = df.copy()
-            df_display['Cost'] = df_display['Cost'].apply(lambda x: f"${x:.4f}")
-            
-            st.dataframe(df_display, use_container_width=True)
-            
-            csv = df.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                label="Download Results as CSV",
-                data=csv,
-                file_name="batch_results.csv",
-                mime="text/csv"
+            df = flatten_batch_results(results, st.session_state.batch_analysis_type, cost_tracker)
+            data_version = uuid.uuid4().hex
+            st.session_state.batch_results_df = df
+            st.session_state.batch_results_version = data_version
+            st.session_state.batch_results_from_run = True
+
+            csv = batch_results_csv(data_version, df)
+            with open("batch_results.csv", "wb") as f:
+                f.write(csv)
+
+            routing_stats = analyzer.get_routing_stats(cost_tracker)
+            latency_saved = routing_stats['latency_saved']
+            latency_saved_display = f"{latency_saved:.1f}s" if latency_saved is not None else "N/A"
+            st.session_state.batch_routing_summary = (
+                f"Model Routing: {routing_stats['escalations']}/{routing_stats['documents']} escalated to "
+                f"{analyzer.escalation_model} | Cost Saved: ${routing_stats['cost_saved']:.4f} | "
+                f"Latency Saved: {latency_saved_display}"
             )
-            
-            total_cost = df['Cost'].sum()
-            avg_conf = df['Confidence'].mean()
-            avg_conf_display = f"{avg_conf:.3f}" if not pd.isna(avg_conf) else "0.000"
-            st.info(f"Total Cost: ${total_cost:.4f}")
-            st.info(f"Average Confidence: {avg_conf_display}")
         else:
             st.warning("No valid files to process.")
 
+    # Results are rendered from session state so paging through them does not
+    # require re-running the batch.
+    if st.session_state.get("batch_results_from_run"):
+        df = st.session_state.batch_results_df
+        data_version = st.session_state.batch_results_version
+
+        render_paginated_table(df, key="batch_results")
+
+        st.download_button(
+            label="Download Results as CSV",
+            data=batch_results_csv(data_version, df),
+            file_name="batch_results.csv",
+            mime="text/csv"
+        )
+
+        total_cost = df['Cost'].sum()
+        avg_conf = df['Confidence'].mean()
+        avg_conf_display = f"{avg_conf:.3f}" if not pd.isna(avg_conf) else "0.000"
+        st.info(f"Total Cost: ${total_cost:.4f}")
+        st.info(f"Average Confidence: {avg_conf_display}")
+        st.info(st.session_state.batch_routing_summary)
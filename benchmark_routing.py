@@ -0,0 +1,52 @@
+import argparse
+import glob
+import os
+from dotenv import load_dotenv
+from src.content_analyzer import ContentAnalyzer, ANALYSIS_TEMPLATES
+from src.cost_tracker import CostTracker
+from src.document_processor import DocumentProcessor
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the model cascade over a corpus and report routing savings.")
+    parser.add_argument("--corpus", default="test_data", help="Directory of .txt/.pdf/.docx documents.")
+    parser.add_argument("--analysis-type", default="General Business", choices=list(ANALYSIS_TEMPLATES.keys()))
+    parser.add_argument("--threshold", type=float, default=0.6, help="Minimum confidence/quality score accepted from the primary model.")
+    args = parser.parse_args()
+
+    analyzer = ContentAnalyzer(confidence_threshold=args.threshold)
+    cost_tracker = CostTracker()
+
+    docs = []
+    for path in sorted(glob.glob(os.path.join(args.corpus, "*"))):
+        if os.path.splitext(path)[1].lower() not in [".pdf", ".docx", ".txt"]:
+            continue
+        docs.append({"id": os.path.basename(path), "text": DocumentProcessor(path).process()["text"]})
+
+    results = analyzer.batch_analyze(docs, args.analysis_type)
+    for result in results:
+        routing = (result["result"] or {}).get("routing", {})
+        print(f"{result['id']}: {result['error'] or routing.get('model')}"
+              f"{' (escalated: ' + routing['reason'] + ')' if routing.get('escalated') else ''}")
+
+    stats = analyzer.get_routing_stats(cost_tracker)
+    print()
+    print(f"Primary model:    {analyzer.primary_model}")
+    print(f"Escalation model: {analyzer.escalation_model}")
+    print(f"Documents:        {stats['documents']}")
+    print(f"Escalations:      {stats['escalations']} ({stats['escalation_rate']:.0%})")
+    for reason, count in stats["escalation_reasons"].items():
+        print(f"  {reason}: {count}")
+    print(f"Actual cost:      ${stats['actual_cost']:.4f}")
+    print(f"Cost saved:       ${stats['cost_saved']:.4f}")
+    print(f"Model latency:    {stats['actual_latency']:.1f}s")
+    if stats["latency_saved"] is None:
+        print("Latency saved:    N/A (no escalation calls to compare against)")
+    else:
+        print(f"Latency saved:    {stats['latency_saved']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import os
 import json
+import time
 from openai import OpenAI
 
 SYSTEM_PROMPT = (
@@ -98,61 +99,242 @@ ANALYSIS_TEMPLATES = {
 }
 
 
+# Score fields checked after the first (cheap) pass. A result whose score falls
+# below the analyzer's confidence threshold is re-run on the escalation model.
+ROUTING_SCORE_FIELDS = {
+    "General Business": [
+        ("sentiment_analysis", "confidence_score"),
+        ("content_classification", "content_quality_score"),
+    ],
+    "Competitive Intelligence": [],
+    "Customer Feedback": [],
+}
+
+
 class ContentAnalyzer:
     """
     A class to analyze content using the OpenAI API.
+
+    Documents are first analyzed with a cheaper primary model. The result is
+    only re-run on the stronger escalation model when it fails validation or
+    reports a low confidence/quality score.
     """
-    def __init__(self):
+    def __init__(self, primary_model=None, escalation_model=None, confidence_threshold=0.6, temperature=0.3):
         """
         Initializes the ContentAnalyzer and the OpenAI client.
+
+        Args:
+            primary_model: Model tried first for every document. Defaults to the
+                PRIMARY_MODEL environment variable or gpt-4o-mini.
+            escalation_model: Stronger model used when the primary result is
+                rejected. Defaults to ESCALATION_MODEL or gpt-4o. Set it equal to
+                primary_model to disable escalation.
+            confidence_threshold: Minimum confidence/quality score accepted from
+                the primary model.
+            temperature: Sampling temperature used for every model call.
         """
         self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.primary_model = primary_model or os.getenv("PRIMARY_MODEL", "gpt-4o-mini")
+        self.escalation_model = escalation_model or os.getenv("ESCALATION_MODEL", "gpt-4o")
+        self.confidence_threshold = confidence_threshold
+        self.temperature = temperature
+        self.reset_routing_stats()
 
+    def reset_routing_stats(self):
+        """
+        Clears the counters collected by the model cascade.
+        """
+        self.routing_stats = {
+            "documents": 0,
+            "escalations": 0,
+            "escalation_reasons": {},
+            "calls": {},
+            "primary_calls": [],
+        }
 
+    def _build_prompt(self, text, analysis_type):
+        template = ANALYSIS_TEMPLATES[analysis_type]
+        return (
+            f"Please perform a '{analysis_type}' analysis on the following document. "
+            f"Based on your expertise, populate the fields in this JSON structure:\n\n"
+            f"{json.dumps(template, indent=2)}\n\n"
+            f"Document to Analyze:\n"
+            f"---------------------\n"
+            f"{text}"
+        )
+
+    def _call_model(self, model, prompt):
+        """
+        Runs a single chat completion and returns (analysis, call_usage).
+
+        The call is counted and returned even when its response is not valid
+        JSON, in which case analysis is None, so the tokens are still billed.
+        """
+        start = time.perf_counter()
+        response = self.client.chat.completions.create(
+            model=model,
+            response_format={"type": "json_object"},
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=self.temperature
+        )
+        latency = time.perf_counter() - start
+        call = {
+            'model': model,
+            'prompt_tokens': response.usage.prompt_tokens,
+            'completion_tokens': response.usage.completion_tokens,
+            'total_tokens': response.usage.total_tokens,
+            'latency': latency
+        }
+        stats = self.routing_stats["calls"].setdefault(model, {"count": 0, "latency": 0.0, "prompt_tokens": 0, "completion_tokens": 0})
+        stats["count"] += 1
+        stats["latency"] += latency
+        stats["prompt_tokens"] += call['prompt_tokens']
+        stats["completion_tokens"] += call['completion_tokens']
+        try:
+            analysis = json.loads(response.choices[0].message.content)
+        except json.JSONDecodeError:
+            analysis = None
+        return analysis, call
+
+    def _usage(self, calls, model):
+        return {
+            'prompt_tokens': sum(c['prompt_tokens'] for c in calls),
+            'completion_tokens': sum(c['completion_tokens'] for c in calls),
+            'total_tokens': sum(c['total_tokens'] for c in calls),
+            'model': model,
+            'calls': calls
+        }
+
+    def validate_analysis(self, analysis, analysis_type):
+        """
+        Checks whether a result is good enough to skip escalation.
+
+        Returns:
+            None if the analysis is acceptable, otherwise a short reason string.
+        """
+        if not isinstance(analysis, dict):
+            return "invalid response"
+        for key in ANALYSIS_TEMPLATES[analysis_type]:
+            if analysis.get(key) is None:
+                return f"missing {key}"
+        for section, field in ROUTING_SCORE_FIELDS.get(analysis_type, []):
+            try:
+                score = float(analysis.get(section, {}).get(field))
+            except (TypeError, ValueError, AttributeError):
+                return f"invalid {field}"
+            if score < self.confidence_threshold:
+                return f"low {field}"
+        return None
 
     def analyze_content(self, text: str, analysis_type: str) -> dict:
         """
-        Analyzes the given text using GPT-4o-mini and returns a structured analysis
-        based on the selected analysis type.
+        Analyzes the given text with the primary model, escalating to the
+        stronger model when needed, and returns a structured analysis based on
+        the selected analysis type.
         Args:
             text: The content to analyze.
             analysis_type: The type of analysis to perform.
 
         Returns:
-            A dictionary containing the detailed business analysis.
+            A dictionary containing the detailed business analysis. Its 'usage'
+            entry holds token totals plus the per-model 'calls' that produced it,
+            and 'routing' records which model answered and why.
         """
         if analysis_type not in ANALYSIS_TEMPLATES:
             return {"error": "Invalid analysis type selected."}
 
-        template = ANALYSIS_TEMPLATES[analysis_type]
-
-        prompt = (
-            f"Please perform a '{analysis_type}' analysis on the following document. "
-            f"Based on your expertise, populate the fields in this JSON structure:\n\n"
-            f"{json.dumps(template, indent=2)}\n\n"
-            f"Document to Analyze:\n"
-            f"---------------------\n"
-            f"{text}"
-        )
+        prompt = self._build_prompt(text, analysis_type)
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                response_format={"type": "json_object"},
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3
-            )
-            analysis = json.loads(response.choices[0].message.content)
-            analysis['usage'] = {
-                'prompt_tokens': response.usage.prompt_tokens,
-                'completion_tokens': response.usage.completion_tokens,
-                'total_tokens': response.usage.total_tokens
-            }
-            return analysis
+            analysis, call = self._call_model(self.primary_model, prompt)
         except Exception as e:
             return {"error": f"An error occurred: {e}"}
+        calls = [call]
+        model = self.primary_model
+        self.routing_stats["documents"] += 1
+        self.routing_stats["primary_calls"].append(call)
+        reason = "invalid JSON" if analysis is None else self.validate_analysis(analysis, analysis_type)
+
+        escalated = False
+        if reason is not None and self.escalation_model != self.primary_model:
+            # A failed escalation falls back to the primary result (if any)
+            # rather than discarding it along with the primary call's usage.
+            try:
+                strong_analysis, call = self._call_model(self.escalation_model, prompt)
+                calls.append(call)
+                if strong_analysis is None:
+                    raise ValueError("the escalation model returned invalid JSON")
+                analysis, model, escalated = strong_analysis, self.escalation_model, True
+            except Exception as e:
+                reason = f"{reason}; escalation failed: {e}"
+
+        if analysis is None:
+            return {
+                "error": f"An error occurred: the model returned {reason}.",
+                "usage": self._usage(calls, model)
+            }
+
+        if escalated:
+            self.routing_stats["escalations"] += 1
+            reasons = self.routing_stats["escalation_reasons"]
+            reasons[reason] = reasons.get(reason, 0) + 1
+
+        analysis['usage'] = self._usage(calls, model)
+        analysis['routing'] = {
+            'model': model,
+            'escalated': escalated,
+            'reason': reason
+        }
+        return analysis
+
+    def get_routing_stats(self, cost_tracker):
+        """
+        Summarizes the cascade against always calling the escalation model.
+
+        The baseline is one escalation-model call per attempted document: the
+        primary call's tokens priced at escalation rates, taking the escalation
+        model's average observed latency. Savings are the baseline minus every
+        recorded call, including failed escalations and errored documents.
+        Latency savings are only estimated once at least one escalation call
+        has been made.
+
+        Args:
+            cost_tracker: CostTracker used to price each model.
+
+        Returns:
+            dict: Document/escalation counts, actual spend and latency, and the
+            estimated spend and latency saved by the cascade.
+        """
+        stats = self.routing_stats
+        actual_cost = sum(
+            cost_tracker.calculate_cost(c["prompt_tokens"], c["completion_tokens"], model)
+            for model, c in stats["calls"].items()
+        )
+        actual_latency = sum(c["latency"] for c in stats["calls"].values())
+
+        documents = stats["documents"]
+        baseline_cost = sum(
+            cost_tracker.calculate_cost(c['prompt_tokens'], c['completion_tokens'], self.escalation_model)
+            for c in stats["primary_calls"]
+        )
+        strong = stats["calls"].get(self.escalation_model)
+        latency_saved = None
+        if strong and strong["count"]:
+            latency_saved = documents * (strong["latency"] / strong["count"]) - actual_latency
+
+        return {
+            "documents": documents,
+            "escalations": stats["escalations"],
+            "escalation_rate": stats["escalations"] / documents if documents else 0.0,
+            "escalation_reasons": dict(stats["escalation_reasons"]),
+            "calls": {model: dict(c) for model, c in stats["calls"].items()},
+            "actual_cost": actual_cost,
+            "actual_latency": actual_latency,
+            "cost_saved": baseline_cost - actual_cost,
+            "latency_saved": latency_saved,
+        }
 
     def batch_analyze(self, documents, analysis_type, progress_callback=None):
         """
@@ -164,9 +346,9 @@ class ContentAnalyzer:
             progress_callback (callable, optional): Function accepting progress (0.0-1.0) for UI updates.
 
         Returns:
-            list: List of dicts with 'id', 'timestamp', 'result', and 'error' (if any).
+            list: List of dicts with 'id', 'timestamp', 'result', 'error' (if any), and
+            'usage', which is kept for errored documents so their calls are still billed.
         """
-        import time
         from datetime import datetime
 
         results = []
@@ -185,7 +367,8 @@ class ContentAnalyzer:
                 'id': doc_id,
                 'timestamp': timestamp,
                 'result': result if not error else None,
-                'error': error
+                'error': error,
+                'usage': result.get('usage') if result else None
             })
             # Progress bar update
             if progress_callback:
@@ -11,6 +11,12 @@ class CostTracker:
         self.monthly_limit = 200.0
         self.input_cost_per_million = 0.50
         self.output_cost_per_million = 1.50
+        # Per-model prices in USD per million tokens. Models not listed here
+        # fall back to input_cost_per_million / output_cost_per_million.
+        self.model_prices = {
+            'gpt-4o-mini': {'input': 0.15, 'output': 0.60},
+            'gpt-4o': {'input': 2.50, 'output': 10.00},
+        }
 
     def _load_usage_data(self):
         try:
@@ -23,12 +29,30 @@ class CostTracker:
         with open(self.usage_file, 'w') as f:
             json.dump(self.usage_data, f, indent=4)
 
-    def record_usage(self, input_tokens, output_tokens):
+    def get_model_prices(self, model=None):
+        prices = self.model_prices.get(model)
+        if prices is None:
+            return {'input': self.input_cost_per_million, 'output': self.output_cost_per_million}
+        return prices
+
+    def price_table(self, models):
+        """Input/output prices for each of `models`, applying the default fallback."""
+        prices = {model: self.get_model_prices(model) for model in models}
+        return (
+            {model: p['input'] for model, p in prices.items()},
+            {model: p['output'] for model, p in prices.items()},
+        )
+
+    def calculate_cost(self, input_tokens, output_tokens, model=None):
+        prices = self.get_model_prices(model)
+        return (input_tokens / 1_000_000) * prices['input'] + \
+               (output_tokens / 1_000_000) * prices['output']
+
+    def record_usage(self, input_tokens, output_tokens, model=None):
         today = datetime.now().strftime('%Y-%m-%d')
         month = datetime.now().strftime('%Y-%m')
         
-        cost = (input_tokens / 1_000_000) * self.input_cost_per_million + \
-               (output_tokens / 1_000_000) * self.output_cost_per_million
+        cost = self.calculate_cost(input_tokens, output_tokens, model)
 
         if today not in self.usage_data:
             self.usage_data[today] = {'tokens': 0, 'cost': 0.0}
@@ -52,12 +76,15 @@ class CostTracker:
                 monthly_cost += data['cost']
         return {'tokens': monthly_tokens, 'cost': monthly_cost}
 
-    def can_afford_analysis(self, input_tokens, output_tokens):
+    def estimate_cost(self, input_tokens, output_tokens, models=(None,)):
+        """Worst-case cost when the same prompt may be sent to each of `models`."""
+        return sum(self.calculate_cost(input_tokens, output_tokens, model) for model in models)
+
+    def can_afford_analysis(self, input_tokens, output_tokens, models=(None,)):
         daily_usage = self.get_daily_usage()
         monthly_usage = self.get_monthly_usage()
         
-        estimated_cost = (input_tokens / 1_000_000) * self.input_cost_per_million + \
-                         (output_tokens / 1_000_000) * self.output_cost_per_million
+        estimated_cost = self.estimate_cost(input_tokens, output_tokens, models)
 
         if daily_usage['cost'] + estimated_cost > self.daily_limit:
             return False, "daily limit exceeded"